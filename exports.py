@@ -0,0 +1,148 @@
+"""
+exports.py
+----------
+Machine-readable publication lists (BibTeX, CSV, JSON) built from the curated
+DATA["publications"] plus the scraped Google Scholar publications.
+
+Every format is produced by a generator that yields one record at a time, so large
+lists are streamed. ``snapshot_hash`` identifies the merged list; callers cache the
+rendered bytes under it so repeat downloads are free until the data changes.
+
+Usage:
+    from exports import merge_publications, snapshot_hash, iter_export
+    records = merge_publications(DATA["publications"], scraped_pubs)
+    digest = snapshot_hash(records)
+    body = "".join(iter_export(records, "bibtex"))
+"""
+from __future__ import annotations
+import io
+import re
+import csv
+import json
+import hashlib
+from typing import Dict, Iterable, Iterator, List, Optional
+
+FORMATS = {
+    # name: (file extension, MIME type)
+    "bibtex": ("bib", "application/x-bibtex"),
+    "csv": ("csv", "text/csv"),
+    "json": ("json", "application/json"),
+}
+
+FIELDS = ["title", "authors", "venue", "year", "url", "source"]
+
+
+def _norm_title(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", (title or "").lower()).strip()
+
+
+def merge_publications(curated: Iterable[Dict], scraped: Optional[Iterable[Dict]] = None) -> List[Dict]:
+    """
+    Merge curated and scraped publications into flat records, newest first.
+    Duplicates (same normalised title) keep the curated entry, filling gaps from the scraped one.
+    """
+    merged: Dict[str, Dict] = {}
+    for source, pubs in (("curated", curated), ("scholar", scraped or [])):
+        for p in pubs:
+            rec = {
+                "title": p.get("title", "") or "",
+                "authors": p.get("authors", "") or "",
+                "venue": p.get("venue", "") or "",
+                "year": str(p.get("year", "") or ""),
+                "url": p.get("url") or p.get("link") or "",
+                "source": source,
+            }
+            key = _norm_title(rec["title"])
+            if not key:
+                continue
+            if key in merged:
+                existing = merged[key]
+                for f in FIELDS:
+                    if not existing[f]:
+                        existing[f] = rec[f]
+            else:
+                merged[key] = rec
+    return sorted(merged.values(), key=lambda r: r["year"], reverse=True)
+
+
+def snapshot_hash(records: List[Dict]) -> str:
+    """Stable digest of a merged publication list; changes whenever any exported field does."""
+    h = hashlib.sha256()
+    for r in records:
+        h.update(json.dumps([r[f] for f in FIELDS], ensure_ascii=False).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()[:16]
+
+
+# ---------- BIBTEX ----------
+_BIB_ESCAPES = {"&": r"\&", "%": r"\%", "$": r"\$", "#": r"\#", "_": r"\_", "{": r"\{", "}": r"\}"}
+
+
+def _bib_escape(text: str) -> str:
+    return "".join(_BIB_ESCAPES.get(c, c) for c in text)
+
+
+def _bib_authors(authors: str) -> str:
+    names = [a.strip() for a in authors.split(",") if a.strip() and a.strip() != "..."]
+    return " and ".join(names)
+
+
+def _bib_key(rec: Dict, used: set) -> str:
+    first_author = rec["authors"].split(",")[0].strip().split(" ")[-1] if rec["authors"] else ""
+    first_word = next((w for w in _norm_title(rec["title"]).split() if len(w) > 3), "pub")
+    base = re.sub(r"[^A-Za-z0-9]", "", f"{first_author}{rec['year']}{first_word}") or "pub"
+    key, n = base, 1
+    while key in used:
+        n += 1
+        key = f"{base}{chr(ord('a') + n - 2) if n <= 27 else n}"
+    used.add(key)
+    return key
+
+
+def iter_bibtex(records: Iterable[Dict]) -> Iterator[str]:
+    used: set = set()
+    for rec in records:
+        fields = [("title", "{" + _bib_escape(rec["title"]) + "}")]
+        if rec["authors"]:
+            fields.append(("author", _bib_escape(_bib_authors(rec["authors"]))))
+        if rec["venue"]:
+            fields.append(("journal", _bib_escape(rec["venue"])))
+        if rec["year"]:
+            fields.append(("year", rec["year"]))
+        if rec["url"]:
+            fields.append(("url", rec["url"]))
+        body = ",\n".join(f"  {k} = {{{v}}}" for k, v in fields)
+        kind = "article" if rec["venue"] else "misc"
+        yield f"@{kind}{{{_bib_key(rec, used)},\n{body}\n}}\n\n"
+
+
+# ---------- CSV ----------
+def iter_csv(records: Iterable[Dict]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for rec in records:
+        writer.writerow(rec)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate(0)
+    if buf.getvalue():
+        yield buf.getvalue()
+
+
+# ---------- JSON ----------
+def iter_json(records: Iterable[Dict]) -> Iterator[str]:
+    yield "["
+    for i, rec in enumerate(records):
+        yield ("," if i else "") + "\n  " + json.dumps({f: rec[f] for f in FIELDS}, ensure_ascii=False)
+    yield "\n]\n"
+
+
+def iter_export(records: Iterable[Dict], fmt: str) -> Iterator[str]:
+    if fmt == "bibtex":
+        return iter_bibtex(records)
+    if fmt == "csv":
+        return iter_csv(records)
+    if fmt == "json":
+        return iter_json(records)
+    raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
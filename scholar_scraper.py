@@ -7,43 +7,314 @@ Scrapes Google Scholar "All" metrics (Citations, h-index, i10-index).
 Usage:
     from scholar_scraper import fetch_scholar_metrics
     metrics = fetch_scholar_metrics("https://scholar.google.com/citations?user=tKDhmdAAAAAJ&hl=en")
+
+    # Multi-tenant: keep each portfolio's cache in its own file
+    metrics = fetch_scholar_metrics(url, namespace="jane")
+
+Cache warmer (run from cron / a systemd timer so web workers never scrape):
+    python -m scholar_scraper warm                      # every tenant in tenants.json
+    python -m scholar_scraper warm --tenant jane
+    python -m scholar_scraper warm --url URL --namespace jane
+    python -m scholar_scraper ttls                      # adaptive TTLs chosen per cached resource
+
+Publication detail pages (abstract, full authors, DOI), rate-limited and cached per paper:
+    details = fetch_publication_details(pubs, namespace="jane")["details"]
 """
 from __future__ import annotations
+import os
+import sys
 import time
 import json
-from typing import Dict, Optional
+import re
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from pathlib import Path
 
+try:
+    import fcntl  # cross-process locks; POSIX only
+except ImportError:  # pragma: no cover - Windows falls back to per-process locking
+    fcntl = None
+
 import requests
 from bs4 import BeautifulSoup
 
+import ttl_policy
+
 CACHE_PATH = Path(__file__).with_name("scholar_metrics_cache.json")
-CACHE_TTL_SECONDS = 60 * 60 * 12  # 12 hours
+PUBS_CACHE_PATH = Path(__file__).with_name("scholar_pubs_cache.json")
+PHOTO_CACHE_PATH = Path(__file__).with_name("scholar_photo_cache.json")
+DETAILS_CACHE_PATH = Path(__file__).with_name("scholar_pub_details_cache.json")
+CACHE_TTL_SECONDS = 60 * 60 * 12  # 12 hours; starting TTL, then adapted per cache file (ttl_policy.py)
+# How long a caller waits for someone else's in-flight fetch; must exceed the worst case of
+# fetch_scholar_metrics (3 x 20 s timeouts + 1.5/3/4.5 s backoff sleeps = 69 s).
+SINGLE_FLIGHT_WAIT_SECONDS = 90
+FAILURE_BACKOFF_SECONDS = 60 * 5  # after a failed fetch, nobody retries that resource for this long
+SCHOLAR_PAGE_ROWS = 20  # rows on one Scholar profile page; scraping fewer saves nothing
+DETAIL_MIN_INTERVAL_SECONDS = float(os.environ.get("SCHOLAR_DETAIL_INTERVAL", 3.0))  # global spacing of detail requests
+DETAIL_MAX_WORKERS = 4
+
+# Cache file field -> adaptive TTL resource name (see ttl_policy.py)
+_RESOURCES = {"metrics": "metrics", "pubs": "pubs", "photo_url": "photo"}
+ADAPTIVE = object()  # max_age sentinel: use the TTL the adaptive policy chose for this file
+_CACHE_FILES = {
+    "metrics": (CACHE_PATH, "metrics"),
+    "pubs": (PUBS_CACHE_PATH, "pubs"),
+    "photo": (PHOTO_CACHE_PATH, "photo_url"),
+}
 
 
 class ScholarBlocked(Exception):
     pass
 
 
-def _load_cache() -> Optional[Dict]:
-    if CACHE_PATH.exists():
+def _cache_path(base: Path, namespace: Optional[str] = None) -> Path:
+    """Per-tenant cache file, e.g. scholar_metrics_cache.jane.json; no namespace keeps the original name."""
+    if not namespace:
+        return base
+    return base.with_name(f"{base.stem}.{namespace}{base.suffix}")
+
+
+def _read_cache_raw(path: Path) -> Dict:
+    try:
+        return json.loads(path.read_text())
+    except Exception:
+        return {}
+
+
+def _read_cache_file(base: Path, field: str, namespace: Optional[str] = None,
+                     max_age: Any = ADAPTIVE) -> Any:
+    """
+    Return ``field`` from a cache file, or None if missing/unreadable/older than ``max_age``.
+    ``max_age=None`` ignores age; the default uses the file's adaptive TTL.
+    """
+    path = _cache_path(base, namespace)
+    if path.exists():
+        data = _read_cache_raw(path)
+        if max_age is ADAPTIVE:
+            max_age = ttl_policy.current_ttl(_RESOURCES.get(field, field), data.get("ttl_state"))
+        if data and (max_age is None or time.time() - data.get("ts", 0) < max_age):
+            return data.get(field)
+    return None
+
+
+def _write_cache_file(base: Path, field: str, value: Any, namespace: Optional[str] = None) -> None:
+    # Write-then-rename so readers in other processes never see a half-written file.
+    path = _cache_path(base, namespace)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        prev = _read_cache_raw(path) if path.exists() else {}
+        changed = None
+        if field in prev:
+            changed = json.dumps(prev[field], sort_keys=True) != json.dumps(value, sort_keys=True)
+        state = ttl_policy.next_state(_RESOURCES.get(field, field), prev.get("ttl_state"), changed)
+        tmp.write_text(json.dumps({"ts": time.time(), field: value, "ttl_state": state}, indent=2))
+        os.replace(tmp, path)
+    except Exception:
         try:
-            data = json.loads(CACHE_PATH.read_text())
-            if time.time() - data.get("ts", 0) < CACHE_TTL_SECONDS:
-                return data.get("metrics")
-        except Exception:
+            tmp.unlink()
+        except OSError:
             pass
-    return None
 
 
-def _save_cache(metrics: Dict) -> None:
+def _save_cache(metrics: Dict, namespace: Optional[str] = None) -> None:
+    _write_cache_file(CACHE_PATH, "metrics", metrics, namespace)
+
+
+# ---------- CACHE-ONLY READERS (used by the app when web workers must not scrape) ----------
+def load_cached_metrics(namespace: Optional[str] = None) -> Optional[Dict[str, int]]:
+    """Metrics written by the warmer, regardless of age."""
+    return _read_cache_file(CACHE_PATH, "metrics", namespace, max_age=None)
+
+
+def load_cached_publications(namespace: Optional[str] = None) -> Optional[List[Dict]]:
+    """Publications written by the warmer, regardless of age. Older files used 'link' for 'url'."""
+    pubs = _read_cache_file(PUBS_CACHE_PATH, "pubs", namespace, max_age=None)
+    if pubs is None:
+        return None
+    return _normalize_pubs(pubs)
+
+
+def _normalize_pubs(pubs: List[Dict]) -> List[Dict]:
+    return [
+        {"title": p.get("title", ""), "venue": p.get("venue", ""), "authors": p.get("authors", ""),
+         "year": p.get("year", ""), "url": p.get("url") or p.get("link", "")}
+        for p in pubs
+    ]
+
+
+def load_cached_photo(namespace: Optional[str] = None) -> Optional[str]:
+    return _read_cache_file(PHOTO_CACHE_PATH, "photo_url", namespace, max_age=None)
+
+
+def load_cached_publication_details(namespace: Optional[str] = None) -> Dict[str, Dict]:
+    """Per-paper detail records keyed by publication URL (see fetch_publication_details)."""
+    entries = _read_cache_file(DETAILS_CACHE_PATH, "details", namespace, max_age=None) or {}
+    return {e["url"]: e["detail"] for e in entries.values() if e.get("url") and e.get("detail")}
+
+
+def cache_ttls(namespace: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    The adaptive TTL currently chosen for each cached resource, with its observed change stats.
+    Returns: {'metrics': {'ttl', 'age', 'refreshes', 'changes', 'change_rate'}, 'pubs': ..., 'photo': ...}
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    for base, field in _CACHE_FILES.values():
+        resource = _RESOURCES[field]
+        path = _cache_path(base, namespace)
+        data = _read_cache_raw(path) if path.exists() else {}
+        state = data.get("ttl_state") or {}
+        out[resource] = {
+            "ttl": ttl_policy.current_ttl(resource, state),
+            "age": round(time.time() - data["ts"], 1) if "ts" in data else None,
+            "refreshes": state.get("refreshes", 0),
+            "changes": state.get("changes", 0),
+            "change_rate": state.get("change_rate"),
+        }
+    return out
+
+
+def cache_ttl(resource: str, namespace: Optional[str] = None) -> float:
+    """Adaptive TTL currently chosen for one resource ('metrics', 'pubs' or 'photo')."""
+    base, _ = _CACHE_FILES[resource]
+    path = _cache_path(base, namespace)
+    data = _read_cache_raw(path) if path.exists() else {}
+    return ttl_policy.current_ttl(resource, data.get("ttl_state"))
+
+
+# ---------- SINGLE-FLIGHT ----------
+# One in-flight scrape per (profile, resource) — i.e. per cache file — across threads
+# (a process-wide lock) and worker processes (flock on a sibling .lock file).
+_flights_lock = threading.Lock()
+_flights: Dict[Path, threading.Lock] = {}
+
+
+@contextmanager
+def _flight(cache_file: Path, wait: bool, timeout: float = SINGLE_FLIGHT_WAIT_SECONDS) -> Iterator[bool]:
+    """Yield True if this caller holds the flight for ``cache_file``, False if someone else does."""
+    with _flights_lock:
+        tlock = _flights.setdefault(cache_file, threading.Lock())
+    deadline = time.time() + timeout
+    acquired = tlock.acquire(timeout=timeout) if wait else tlock.acquire(blocking=False)
+    if not acquired:
+        yield False
+        return
+    fh = None
+    try:
+        if fcntl is not None:
+            fh = open(cache_file.with_name(f".{cache_file.name}.lock"), "a")
+            while True:
+                try:
+                    fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except OSError:
+                    if not wait or time.time() >= deadline:
+                        yield False
+                        return
+                    time.sleep(0.1)
+        yield True
+    finally:
+        if fh is not None:
+            fh.close()  # closing releases the flock
+        tlock.release()
+
+
+def _failure_marker(cache_file: Path) -> Path:
+    return cache_file.with_name(f".{cache_file.name}.failed")
+
+
+def _recently_failed(cache_file: Path) -> bool:
+    try:
+        return time.time() - _failure_marker(cache_file).stat().st_mtime < FAILURE_BACKOFF_SECONDS
+    except OSError:
+        return False
+
+
+def _lead_fetch(cache_file: Path, fetch: Callable[[], Any]) -> Any:
+    """Run ``fetch`` as the flight leader, recording a failure (exception or empty result) for followers."""
+    marker = _failure_marker(cache_file)
     try:
-        CACHE_PATH.write_text(json.dumps({"ts": time.time(), "metrics": metrics}, indent=2))
+        result = fetch()
     except Exception:
-        pass
+        marker.touch()
+        raise
+    if result:
+        try:
+            marker.unlink()
+        except OSError:
+            pass
+    else:
+        marker.touch()
+    return result
+
+
+def _single_flight_fetch(base: Path, field: str, namespace: Optional[str], use_cache: bool,
+                         fetch: Callable[[], Any]) -> Any:
+    """
+    Return a fresh cached value, or run ``fetch`` (which writes the cache) as the only caller.
+    Callers that lose the race get the stale value if one exists, otherwise they wait for the
+    leader and read what it wrote. A leader whose fetch fails also returns the stale value when
+    there is one. After a failed fetch nobody scrapes that resource again for
+    FAILURE_BACKOFF_SECONDS: callers get the stale value or ScholarBlocked.
+    """
+    if use_cache:
+        fresh = _read_cache_file(base, field, namespace)
+        if fresh:
+            return fresh
+
+    cache_file = _cache_path(base, namespace)
 
+    def stale_or_raise(reason: str) -> Any:
+        stale = _read_cache_file(base, field, namespace, max_age=None) if use_cache else None
+        if stale:
+            return stale
+        raise ScholarBlocked(reason)
 
-def fetch_scholar_metrics(profile_url: str, timeout: int = 20, max_retries: int = 3) -> Dict[str, int]:
+    def lead() -> Any:
+        try:
+            result = _lead_fetch(cache_file, fetch)
+        except Exception:
+            stale = _read_cache_file(base, field, namespace, max_age=None) if use_cache else None
+            if stale:
+                return stale
+            raise
+        if not result and use_cache:
+            return _read_cache_file(base, field, namespace, max_age=None) or result
+        return result
+
+    backoff = f"A recent fetch of {cache_file.name} failed; backing off."
+    if _recently_failed(cache_file):
+        return stale_or_raise(backoff)
+
+    with _flight(cache_file, wait=False) as leader:
+        if leader:
+            if use_cache:
+                fresh = _read_cache_file(base, field, namespace)  # filled while we were acquiring
+                if fresh:
+                    return fresh
+            return lead()
+
+    if use_cache:
+        stale = _read_cache_file(base, field, namespace, max_age=None)
+        if stale:
+            return stale
+
+    with _flight(cache_file, wait=True) as leader:
+        if not leader:
+            raise ScholarBlocked(f"Timed out waiting for an in-flight fetch of {cache_file.name}.")
+        fresh = _read_cache_file(base, field, namespace)
+        if fresh:
+            return fresh
+        if _recently_failed(cache_file):
+            return stale_or_raise(backoff)  # the leader failed; don't pile on
+        return lead()
+
+
+def fetch_scholar_metrics(profile_url: str, timeout: int = 20, max_retries: int = 3,
+                          namespace: Optional[str] = None, use_cache: bool = True) -> Dict[str, int]:
     headers = {
         "User-Agent": (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -52,46 +323,45 @@ def fetch_scholar_metrics(profile_url: str, timeout: int = 20, max_retries: int
         "Accept-Language": "en-US,en;q=0.9",
     }
 
-    cached = _load_cache()
-    if cached:
-        return cached
+    def scrape() -> Dict[str, int]:
+        last_exc = None
+        for attempt in range(1, max_retries + 1):
+            try:
+                resp = requests.get(profile_url, headers=headers, timeout=timeout)
+                if resp.status_code != 200:
+                    raise ScholarBlocked(f"HTTP {resp.status_code} from Google Scholar")
 
-    last_exc = None
-    for attempt in range(1, max_retries + 1):
-        try:
-            resp = requests.get(profile_url, headers=headers, timeout=timeout)
-            if resp.status_code != 200:
-                raise ScholarBlocked(f"HTTP {resp.status_code} from Google Scholar")
+                html = resp.text
+                if "Our systems have detected unusual traffic" in html or "gs_captcha" in html:
+                    raise ScholarBlocked("Blocked by Google Scholar (CAPTCHA). Try later.")
 
-            html = resp.text
-            if "Our systems have detected unusual traffic" in html or "gs_captcha" in html:
-                raise ScholarBlocked("Blocked by Google Scholar (CAPTCHA). Try later.")
+                soup = BeautifulSoup(html, "html.parser")
+                table = soup.find("table", id="gsc_rsb_st")
+                if not table:
+                    raise ScholarBlocked("Metrics table not found (structure may have changed).")
 
-            soup = BeautifulSoup(html, "html.parser")
-            table = soup.find("table", id="gsc_rsb_st")
-            if not table:
-                raise ScholarBlocked("Metrics table not found (structure may have changed).")
-
-            cells = table.select("td.gsc_rsb_std")
-            if len(cells) < 5:
-                raise ScholarBlocked("Unexpected metrics layout; not enough cells.")
-
-            def to_int(text: str) -> int:
-                return int(text.replace(",", "").strip())
-
-            metrics = {
-                "citations": to_int(cells[0].get_text()),
-                "h_index": to_int(cells[2].get_text()),
-                "i10_index": to_int(cells[4].get_text()),
-            }
-            _save_cache(metrics)
-            return metrics
-
-        except (requests.RequestException, ScholarBlocked) as e:
-            last_exc = e
-            time.sleep(1.5 * attempt)
+                cells = table.select("td.gsc_rsb_std")
+                if len(cells) < 5:
+                    raise ScholarBlocked("Unexpected metrics layout; not enough cells.")
+
+                def to_int(text: str) -> int:
+                    return int(text.replace(",", "").strip())
+
+                metrics = {
+                    "citations": to_int(cells[0].get_text()),
+                    "h_index": to_int(cells[2].get_text()),
+                    "i10_index": to_int(cells[4].get_text()),
+                }
+                _save_cache(metrics, namespace)
+                return metrics
 
-    raise last_exc if last_exc else RuntimeError("Unknown error fetching Scholar metrics")
+            except (requests.RequestException, ScholarBlocked) as e:
+                last_exc = e
+                time.sleep(1.5 * attempt)
+
+        raise last_exc if last_exc else RuntimeError("Unknown error fetching Scholar metrics")
+
+    return _single_flight_fetch(CACHE_PATH, "metrics", namespace, use_cache, scrape)
 
 
 
@@ -109,7 +379,26 @@ def _url_with_pubdate(profile_url: str) -> str:
     return urlunparse((u.scheme, u.netloc, u.path, u.params, new_q, u.fragment))
 
 
-def fetch_latest_publications(profile_url: str, count: int = 5) -> list[dict]:
+def fetch_latest_publications(profile_url: str, count: int = 5, namespace: Optional[str] = None,
+                              use_cache: bool = True) -> list[dict]:
+    """
+    Latest publications from a Google Scholar profile, through the publications cache file.
+    Returns: [{'title','venue','authors','year','url'}], or [] if blocked / not found.
+    """
+    def scrape() -> list[dict]:
+        pubs = _scrape_latest_publications(profile_url, max(count, SCHOLAR_PAGE_ROWS))
+        if pubs:
+            _write_cache_file(PUBS_CACHE_PATH, "pubs", pubs, namespace)
+        return pubs
+
+    try:
+        pubs = _single_flight_fetch(PUBS_CACHE_PATH, "pubs", namespace, use_cache, scrape)
+    except Exception:
+        return []
+    return _normalize_pubs(pubs)[:count]
+
+
+def _scrape_latest_publications(profile_url: str, count: int = 5) -> list[dict]:
     """
     Scrape the latest publications from a Google Scholar profile.
     Returns: [{'title','venue','authors','year','url'}]
@@ -203,3 +492,337 @@ def fetch_scholar_profile_photo(profile_url: str, timeout: int = 20, max_retries
             last_exc = e
     return None
 
+
+# ---------- PUBLICATION DETAIL PAGES ----------
+class _RateLimiter:
+    """
+    Spaces request starts at least ``min_interval`` seconds apart across all threads and, through
+    a flock-guarded timestamp file, all processes (per-process only where fcntl is unavailable).
+    """
+
+    def __init__(self, min_interval: float, state_file: Path):
+        self.min_interval = min_interval
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def _reserve(self, now: float) -> float:
+        """Claim the next free start slot and return it."""
+        if fcntl is None:
+            start = max(now, self._next)
+            self._next = start + self.min_interval
+            return start
+        with open(self.state_file, "a+") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            fh.seek(0)
+            try:
+                next_free = float(fh.read().strip() or 0)
+            except ValueError:
+                next_free = 0.0
+            start = max(now, next_free)
+            fh.seek(0)
+            fh.truncate()
+            fh.write(repr(start + self.min_interval))
+            fh.flush()
+        return start  # closing releases the flock
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.time()
+            start = self._reserve(now)
+        if start > now:
+            time.sleep(start - now)
+
+
+_DETAIL_LIMITER = _RateLimiter(DETAIL_MIN_INTERVAL_SECONDS,
+                               DETAILS_CACHE_PATH.with_name(".scholar_detail_rate.lock"))
+
+
+def _paper_id(url: str) -> str:
+    """Scholar's citation_for_view id for a publication URL (the URL itself if absent)."""
+    return dict(parse_qsl(urlparse(url).query)).get("citation_for_view", url)
+
+
+def _row_hash(pub: Dict) -> str:
+    """Digest of the profile-list row; a detail record is refetched only when this changes."""
+    row = [pub.get("title", ""), pub.get("venue", ""), pub.get("authors", ""), str(pub.get("year", ""))]
+    return hashlib.sha1(json.dumps(row, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _parse_publication_detail(html: str, url: str) -> Dict[str, str]:
+    soup = BeautifulSoup(html, "html.parser")
+    title_el = soup.find(id="gsc_oci_title")
+    detail = {"title": title_el.get_text(" ", strip=True) if title_el else "", "url": url}
+
+    fields = {}
+    for row in soup.select("#gsc_oci_table .gs_scl"):
+        name = row.find("div", class_="gsc_oci_field")
+        value = row.find("div", class_="gsc_oci_value")
+        if name and value:
+            fields[name.get_text(strip=True).lower()] = value
+
+    def text(*names: str) -> str:
+        for n in names:
+            if n in fields:
+                return fields[n].get_text(" ", strip=True)
+        return ""
+
+    detail["authors"] = text("authors", "inventors")
+    detail["date"] = text("publication date")
+    detail["venue"] = text("journal", "conference", "book", "source")
+    detail["publisher"] = text("publisher")
+    descr = soup.find(id="gsc_oci_descr")
+    detail["abstract"] = descr.get_text(" ", strip=True) if descr else text("description")
+
+    link = title_el.find("a", class_="gsc_oci_title_link") if title_el else None
+    detail["publisher_url"] = link["href"] if link and link.has_attr("href") else ""
+    # Only this paper's own link and fields; the rest of the page links to other articles.
+    sources = [detail["publisher_url"]]
+    for name, value in fields.items():
+        if name in ("scholar articles", "total citations"):
+            continue
+        sources.append(value.get_text(" ", strip=True))
+        sources.extend(a["href"] for a in value.find_all("a", href=True))
+    m = re.search(r"\b(10\.\d{4,9}/[^\s\"'<>&?#]+)", " ".join(sources))
+    detail["doi"] = m.group(1).rstrip(".,;") if m else ""
+    return detail
+
+
+def _fetch_publication_detail(url: str, timeout: int = 20) -> Dict[str, str]:
+    """Fetch and parse one detail page. Callers must pass through _DETAIL_LIMITER.wait() first."""
+    headers = {
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+        ),
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+    resp = requests.get(url, headers=headers, timeout=timeout)
+    if resp.status_code != 200:
+        raise ScholarBlocked(f"HTTP {resp.status_code} from Google Scholar")
+    html = resp.text
+    if "Our systems have detected unusual traffic" in html or "gs_captcha" in html:
+        raise ScholarBlocked("Blocked by Google Scholar (CAPTCHA). Try later.")
+    return _parse_publication_detail(html, url)
+
+
+def fetch_publication_details(pubs: List[Dict], namespace: Optional[str] = None,
+                              max_workers: int = DETAIL_MAX_WORKERS) -> Dict[str, Any]:
+    """
+    Fetch detail pages (full authors, date, abstract, DOI) for a batch of publications.
+    Runs up to ``max_workers`` requests concurrently, but request starts are globally spaced
+    DETAIL_MIN_INTERVAL_SECONDS apart. Records are cached per paper and never expire unless
+    the paper's profile-list row changes. Stops scheduling new requests once Scholar blocks us.
+    Returns: {'details': {url: detail}, 'fetched': n, 'cached': n, 'errors': [...]}
+    """
+    cache_file = _cache_path(DETAILS_CACHE_PATH, namespace)
+    entries: Dict[str, Dict] = dict(_read_cache_file(DETAILS_CACHE_PATH, "details", namespace, max_age=None) or {})
+
+    todo = []
+    for p in pubs:
+        url = p.get("url") or p.get("link")
+        if not url:
+            continue
+        entry = entries.get(_paper_id(url))
+        if not entry or entry.get("row_hash") != _row_hash(p):
+            todo.append((url, p))
+
+    blocked = threading.Event()
+    errors: List[str] = []
+
+    def work(item: tuple) -> Optional[tuple]:
+        url, pub = item
+        if blocked.is_set():
+            return None
+        _DETAIL_LIMITER.wait()
+        if blocked.is_set():  # Scholar blocked us while we were waiting for our slot
+            return None
+        try:
+            return url, pub, _fetch_publication_detail(url)
+        except ScholarBlocked as e:
+            blocked.set()
+            errors.append(str(e))
+        except Exception as e:
+            errors.append(f"{url}: {e}")
+        return None
+
+    fetched = 0
+    if todo:
+        with _flight(cache_file, wait=False) as leader:
+            if leader:
+                with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+                    for result in pool.map(work, todo):
+                        if result:
+                            url, pub, detail = result
+                            entries[_paper_id(url)] = {"url": url, "row_hash": _row_hash(pub), "detail": detail}
+                            fetched += 1
+                if fetched:
+                    # Re-read so records written by another process meanwhile are kept.
+                    latest = _read_cache_file(DETAILS_CACHE_PATH, "details", namespace, max_age=None) or {}
+                    _write_cache_file(DETAILS_CACHE_PATH, "details", {**latest, **entries}, namespace)
+
+    details = {e["url"]: e["detail"] for e in entries.values() if e.get("url") and e.get("detail")}
+    return {"details": details, "fetched": fetched, "cached": len(details) - fetched, "errors": errors}
+
+
+# ---------- CACHE WARMER ----------
+def warm_profile(profile_url: str, namespace: Optional[str] = None, count: int = 20,
+                 force: bool = False, details: bool = True) -> Dict[str, Any]:
+    """
+    Refresh metrics, latest publications and the photo URL for one profile into the cache files,
+    plus detail pages for new or changed publications when ``details`` is set.
+    Resources still within their adaptive TTL are skipped unless ``force`` is set.
+    A failed resource keeps its previous cache file. Returns a per-resource status dict.
+    """
+    result: Dict[str, Any] = {"url": profile_url, "namespace": namespace, "ok": True}
+
+    def fresh(base: Path, field: str) -> bool:
+        return not force and _read_cache_file(base, field, namespace) is not None
+
+    if fresh(CACHE_PATH, "metrics"):
+        result["metrics"] = {"ok": True, "skipped": True}
+    else:
+        try:
+            metrics = fetch_scholar_metrics(profile_url, namespace=namespace, use_cache=False)
+            result["metrics"] = {"ok": True, **metrics}
+        except Exception as e:
+            result["metrics"] = {"ok": False, "error": str(e)}
+
+    if fresh(PUBS_CACHE_PATH, "pubs"):
+        result["publications"] = {"ok": True, "skipped": True}
+    else:
+        pubs = fetch_latest_publications(profile_url, count=count, namespace=namespace, use_cache=False)
+        if pubs:
+            result["publications"] = {"ok": True, "count": len(pubs)}
+        else:
+            result["publications"] = {"ok": False, "error": "No publications fetched (blocked or layout changed)."}
+
+    if details:
+        res = fetch_publication_details((load_cached_publications(namespace) or [])[:count], namespace=namespace)
+        result["details"] = {"ok": not res["errors"], "fetched": res["fetched"], "cached": res["cached"]}
+        if res["errors"]:
+            result["details"]["errors"] = res["errors"][:5]
+
+    if fresh(PHOTO_CACHE_PATH, "photo_url"):
+        result["photo"] = {"ok": True, "skipped": True}
+    else:
+        photo = fetch_scholar_profile_photo(profile_url)
+        if photo:
+            _write_cache_file(PHOTO_CACHE_PATH, "photo_url", photo, namespace)
+            result["photo"] = {"ok": True, "url": photo}
+        else:
+            result["photo"] = {"ok": False, "error": "Profile photo not found."}
+
+    result["ok"] = all(result[k]["ok"] for k in ("metrics", "publications", "photo", "details") if k in result)
+    result["ttls"] = {k: v["ttl"] for k, v in cache_ttls(namespace).items()}
+    return result
+
+
+_NAMESPACE_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")  # same rule as tenant slugs
+
+
+def _check_namespace(namespace: Optional[str]) -> None:
+    """Namespaces become part of cache file names; reject anything that is not slug-like."""
+    if namespace is not None and not _NAMESPACE_RE.match(namespace):
+        raise SystemExit(f"Invalid --namespace {namespace!r}: use lowercase letters, digits, '-' and '_'.")
+
+
+def _warm_targets(args: argparse.Namespace) -> List[tuple]:
+    _check_namespace(args.namespace)
+    if args.url:
+        return [(args.url, args.namespace)]
+    import tenants
+    registry = tenants.list_tenants()
+    if args.namespace:
+        if args.tenant:
+            raise SystemExit("Use either --tenant or --namespace, not both.")
+        matches = [t for t in registry.values() if t.cache_namespace == args.namespace]
+        if not matches:
+            raise SystemExit(f"--namespace {args.namespace!r} matches no tenant; pass --url with it.")
+        return [(t.scholar_url, t.cache_namespace) for t in matches]
+    return [(t.scholar_url, t.cache_namespace) for t in _select_tenants(registry, args.tenant)]
+
+
+def _select_tenants(registry: Dict, slugs: Optional[List[str]]) -> List:
+    """Tenants named by --tenant, or every configured tenant."""
+    slugs = slugs or list(registry)
+    unknown = [s for s in slugs if s not in registry]
+    if unknown:
+        raise SystemExit(f"Unknown tenant(s): {', '.join(unknown)}")
+    return [registry[s] for s in slugs]
+
+
+def _ttl_namespaces(args: argparse.Namespace) -> List[Optional[str]]:
+    _check_namespace(args.namespace)
+    if args.namespace:
+        if args.tenant:
+            raise SystemExit("Use either --tenant or --namespace, not both.")
+        return [args.namespace]
+    import tenants
+    return [t.cache_namespace for t in _select_tenants(tenants.list_tenants(), args.tenant)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    CLI entry point. Prints a JSON summary to stdout.
+    ``warm`` exit codes: 0 everything refreshed, 1 some resources failed, 2 nothing refreshed / usage error.
+    """
+    parser = argparse.ArgumentParser(prog="python -m scholar_scraper",
+                                     description="Google Scholar scraper and cache warmer.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    warm = sub.add_parser("warm", help="Refresh the shared Scholar caches out of band.")
+    warm.add_argument("--tenant", action="append", help="Tenant slug from tenants.json (repeatable).")
+    warm.add_argument("--url", help="Warm a single Scholar profile URL instead of tenants.")
+    warm.add_argument("--namespace", help="Cache namespace for --url (default: the original cache files); "
+                                          "without --url, warms the tenant using this namespace.")
+    warm.add_argument("--count", type=int, default=20, help="Number of latest publications to keep.")
+    warm.add_argument("--delay", type=float, default=5.0, help="Seconds to wait between profiles.")
+    warm.add_argument("--force", action="store_true", help="Refresh even resources still within their TTL.")
+    warm.add_argument("--no-details", dest="details", action="store_false",
+                      help="Skip fetching detail pages for new or changed publications.")
+    ttls = sub.add_parser("ttls", help="Show the adaptive cache TTLs and observed change rates.")
+    ttls.add_argument("--tenant", action="append", help="Tenant slug from tenants.json (repeatable).")
+    ttls.add_argument("--namespace", help="Cache namespace (default: the original cache files).")
+
+    try:
+        args = parser.parse_args(argv)
+        if args.command == "ttls":
+            namespaces = _ttl_namespaces(args)
+        else:
+            targets = _warm_targets(args)
+    except SystemExit as e:
+        if e.code in (0, None):
+            return 0  # --help
+        if isinstance(e.code, str):
+            print(json.dumps({"ok": False, "error": e.code}))
+        return 2
+
+    if args.command == "ttls":
+        print(json.dumps({(ns or "default"): cache_ttls(ns) for ns in namespaces}, indent=2))
+        return 0
+
+    started = time.time()
+    results = []
+    for i, (url, namespace) in enumerate(targets):
+        if i and args.delay > 0:
+            time.sleep(args.delay)
+        results.append(warm_profile(url, namespace=namespace, count=args.count, force=args.force,
+                                    details=args.details))
+
+    ok_count = sum(r["ok"] for r in results)
+    any_refreshed = any(r[k]["ok"] for r in results for k in ("metrics", "publications", "photo"))
+    summary = {
+        "ok": ok_count == len(results),
+        "profiles": len(results),
+        "profiles_ok": ok_count,
+        "elapsed_seconds": round(time.time() - started, 2),
+        "results": results,
+    }
+    print(json.dumps(summary, indent=2))
+    if summary["ok"]:
+        return 0
+    return 1 if any_refreshed else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
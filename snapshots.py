@@ -0,0 +1,80 @@
+"""
+snapshots.py
+------------
+Immutable, versioned snapshots of content and scraped data.
+
+A snapshot is built once per refresh, deep-frozen (dicts become read-only mappings,
+lists become tuples) and stored in a shared cache. Every session reads the same object
+by reference: nothing is copied or deserialised per rerun, and a refresh publishes a
+new snapshot by swapping the cache entry, so readers see either the old or the new one.
+
+Usage:
+    from snapshots import cached_snapshot
+    snap = cached_snapshot(tenants.SCRAPE_CACHE, ("jane", "metrics"), fetch, ttl=3600)
+    snap.version, snap.data["citations"]
+"""
+from __future__ import annotations
+import time
+import pickle
+import itertools
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Hashable, Mapping, Optional
+
+_versions = itertools.count(1)  # process-wide, monotonically increasing snapshot versions
+
+
+def freeze(obj: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists/sets to tuples."""
+    if isinstance(obj, MappingProxyType):
+        return obj
+    if isinstance(obj, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+def thaw(obj: Any) -> Any:
+    """Mutable deep copy of a frozen value (for callers that really need to modify it)."""
+    if isinstance(obj, Mapping):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [thaw(v) for v in obj]
+    return obj
+
+
+def nbytes(value: Any) -> int:
+    """Approximate memory held by a (possibly frozen) value, measured as its pickled size."""
+    if isinstance(value, Snapshot):
+        return value.nbytes
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return len(pickle.dumps(thaw(value), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int
+    data: Any
+    created: float = field(default_factory=time.time)
+    nbytes: int = 0
+
+
+def make_snapshot(value: Any) -> Snapshot:
+    """Freeze ``value`` into a new snapshot with the next version number."""
+    try:
+        size = nbytes(value)
+    except Exception:
+        size = 0
+    return Snapshot(version=next(_versions), data=freeze(value), nbytes=size)
+
+
+def cached_snapshot(cache: Any, key: Hashable, fetch: Callable[[], Any],
+                    ttl: Optional[Any] = None) -> Snapshot:
+    """
+    Return the current snapshot for ``key`` from ``cache`` (a tenants.LRUCache), building and
+    publishing a new one from ``fetch()`` when it is missing or expired.
+    """
+    return cache.get_or_set(key, lambda: make_snapshot(fetch()), ttl=ttl)
@@ -1,16 +1,35 @@
 # streamlit_app.py
+import os
+import html
+import math
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional
 
 import streamlit as st
 
-from data import DATA
+import tenants
+import exports
+import snapshots
 import scholar_scraper
 
 # ---------- CONFIG ----------
-SCHOLAR_URL = "https://scholar.google.com/citations?user=tKDhmdAAAAAJ&hl=en"
 APP_DIR = Path(__file__).resolve().parent
-BIO_PATH = APP_DIR / "static" / "biography.txt"
+
+# Multi-tenant: ?tenant=<slug> picks the portfolio; without tenants.json this is data.py.
+try:
+    TENANT = tenants.resolve_tenant(st.query_params.get("tenant"))
+except tenants.UnknownTenant as e:
+    st.set_page_config(page_title="Portfolio not found", page_icon="📄")
+    st.error(str(e))
+    st.stop()
+
+# Content and scraped data are immutable snapshots shared by reference across sessions
+# (see snapshots.py); nothing below mutates them, and nothing is copied per rerun.
+CONTENT = tenants.content_snapshot(TENANT)
+DATA = CONTENT.data
+SCHOLAR_URL = TENANT.scholar_url
+BIO_PATH = TENANT.bio_path
+CONTENT_VERSION = CONTENT.version
 
 st.set_page_config(
     page_title=f"{DATA['name']} — Portfolio",
@@ -20,34 +39,194 @@ st.set_page_config(
 )
 
 # ---------- HELPERS ----------
-@st.cache_data(ttl=3600, show_spinner=False)
+# Caches live in per-process, memory-bounded LRUs keyed by tenant (see tenants.py),
+# so hundreds of portfolios can share one process.
+# Cache-only mode: web workers never call Google Scholar; they read what
+# `python -m scholar_scraper warm` wrote, re-checking the files every few minutes.
+CACHE_ONLY = os.environ.get("PORTFOLIO_CACHE_ONLY", "").lower() in ("1", "true", "yes")
+CACHE_ONLY_POLL_SECONDS = 60 * 5
+FALLBACK_TTL_SECONDS = 60  # results that fell back to static DATA are retried soon
+
+
+def scrape_ttl(resource: str, fallback: Optional[Dict[str, bool]] = None) -> Callable[[], float]:
+    """
+    In-memory TTL for a scraped resource: the adaptive TTL of its cache file (see ttl_policy.py).
+    If the fetch set ``fallback["used"]``, the result is kept only for FALLBACK_TTL_SECONDS.
+    """
+    def ttl() -> float:
+        if fallback and fallback.get("used"):
+            return FALLBACK_TTL_SECONDS
+        if CACHE_ONLY:
+            return CACHE_ONLY_POLL_SECONDS
+        return scholar_scraper.cache_ttl(resource, TENANT.cache_namespace)
+    return ttl
+
+
 def load_bio() -> str:
-    try:
-        return BIO_PATH.read_text(encoding="utf-8").strip()
-    except Exception:
-        return ""
+    return tenants.load_bio(TENANT)
+
 
-@st.cache_data(ttl=60 * 60 * 12, show_spinner=False)
 def get_metrics() -> Dict[str, int]:
     """Fetch Scholar metrics with caching; fallback to DATA metrics."""
-    try:
-        m = scholar_scraper.fetch_scholar_metrics(SCHOLAR_URL)
-        return {**DATA.get("metrics", {}), **m}
-    except Exception:
-        return DATA.get("metrics", {})
-
-@st.cache_data(ttl=60 * 60 * 12, show_spinner=False)
-def get_latest_pubs(count: int = 5) -> List[Dict[str, Optional[str]]]:
+    fell_back = {"used": False}
+
+    def fetch() -> Dict[str, int]:
+        try:
+            if CACHE_ONLY:
+                m = scholar_scraper.load_cached_metrics(TENANT.cache_namespace)
+            else:
+                m = scholar_scraper.fetch_scholar_metrics(SCHOLAR_URL, namespace=TENANT.cache_namespace)
+        except Exception:
+            m = None
+        fell_back["used"] = not m
+        return {**DATA.get("metrics", {}), **(m or {})}
+    return snapshots.cached_snapshot(
+        tenants.SCRAPE_CACHE, (TENANT.slug, "metrics"), fetch, ttl=scrape_ttl("metrics", fell_back)
+    ).data
+
+
+def latest_pubs_snapshot(count: int = 5) -> snapshots.Snapshot:
     """Fetch latest publications with caching; fallback to static DATA list."""
-    try:
-        return scholar_scraper.fetch_latest_publications(SCHOLAR_URL, count=count)
-    except Exception:
+    fell_back = {"used": False}
+
+    def fallback() -> List[Dict[str, Optional[str]]]:
+        fell_back["used"] = True
         pubs = sorted(DATA.get("publications", []), key=lambda p: p.get("year", 0), reverse=True)
         return [
             {"title": p["title"], "year": p.get("year"), "venue": p.get("venue", ""), "url": None, "authors": ""}
             for p in pubs[:count]
         ]
 
+    def fetch() -> List[Dict[str, Optional[str]]]:
+        if CACHE_ONLY:
+            cached = scholar_scraper.load_cached_publications(TENANT.cache_namespace)
+            return cached[:count] if cached else fallback()
+        try:
+            pubs = scholar_scraper.fetch_latest_publications(SCHOLAR_URL, count=count,
+                                                             namespace=TENANT.cache_namespace)
+        except Exception:
+            return fallback()
+        fell_back["used"] = not pubs  # blocked with nothing on disk; retry soon
+        return pubs
+    return snapshots.cached_snapshot(
+        tenants.SCRAPE_CACHE, (TENANT.slug, "latest_pubs", count), fetch, ttl=scrape_ttl("pubs", fell_back)
+    )
+
+
+def get_latest_pubs(count: int = 5) -> List[Dict[str, Optional[str]]]:
+    return latest_pubs_snapshot(count).data
+
+
+def get_pub_details() -> Dict[str, Dict]:
+    """
+    Detail records (abstract, full authors, DOI) keyed by publication URL, from the per-paper cache.
+    Detail pages are rate-limited and slow, so only `python -m scholar_scraper warm` fetches them.
+    """
+    return snapshots.cached_snapshot(
+        tenants.SCRAPE_CACHE, (TENANT.slug, "pub_details"),
+        lambda: scholar_scraper.load_cached_publication_details(TENANT.cache_namespace),
+        ttl=CACHE_ONLY_POLL_SECONDS,
+    ).data
+
+
+def get_export(fmt: str, scraped: snapshots.Snapshot) -> bytes:
+    """
+    Export curated + scraped publications. The merged list and its hash are computed once per
+    (content, scraped) snapshot version; the rendered bytes are cached by that hash.
+    """
+    def merge():
+        records = exports.merge_publications(DATA["publications"], scraped.data)
+        return snapshots.freeze((records, exports.snapshot_hash(records)))
+
+    records, digest = tenants.RENDER_CACHE.get_or_set(
+        (TENANT.slug, "export_records", CONTENT_VERSION, scraped.version), merge
+    )
+    return tenants.RENDER_CACHE.get_or_set(
+        (TENANT.slug, "export", fmt, digest),
+        lambda: "".join(exports.iter_export(records, fmt)).encode("utf-8"),
+    )
+
+
+def cached_html(name: str, build: Callable[[], Any]) -> Any:
+    """Render a content-only HTML fragment (or derived list) once per tenant and content version."""
+    return tenants.RENDER_CACHE.get_or_set((TENANT.slug, name, CONTENT_VERSION),
+                                           lambda: snapshots.freeze(build()))
+
+
+# ---------- PUBLICATION LIST (paginated, one HTML emission per page) ----------
+PUBS_PAGE_SIZE = 10
+
+
+def _pub_year(p: Dict) -> int:
+    try:
+        return int(p.get("year") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def selected_pub_card(p: Dict) -> str:
+    return (
+        f"<div class='card' style='padding:.8rem 1rem;margin-bottom:.6rem'>"
+        f"<strong>{p['title']}</strong> — <em class='muted'>{p['venue']}</em>"
+        f"</div>"
+    )
+
+
+def latest_pub_card(p: Dict, detail: Optional[Dict] = None) -> str:
+    # Everything here comes from scraped pages, so escape it before it reaches the HTML.
+    detail = detail or {}
+    esc = html.escape
+    venue = esc(p.get("venue", ""))
+    authors = esc(detail.get("authors") or p.get("authors", ""))
+    doi = esc(detail.get("doi", ""))
+    meta = " · ".join(x for x in (
+        esc(detail.get("date", "")),
+        f"<a href='https://doi.org/{doi}' target='_blank'>doi:{doi}</a>" if doi else "",
+    ) if x)
+    abstract = esc(detail.get("abstract", ""))
+    return (
+        f"<div class='card' style='padding:.9rem 1rem;margin-bottom:.6rem'>"
+        f"<a href='{esc(p.get('url') or '#')}' target='_blank'><strong>{esc(p.get('title', ''))}</strong></a>"
+        + (f" — <em class='muted'>{venue}</em>" if venue else "")
+        + (f"<div class='small muted' style='margin-top:.25rem'>{authors}</div>" if authors else "")
+        + (f"<div class='small muted'>{meta}</div>" if meta else "")
+        + (f"<details class='small' style='margin-top:.35rem'><summary>Abstract</summary>"
+           f"<p>{abstract}</p></details>" if abstract else "")
+        + "</div>"
+    )
+
+
+def publications_page_html(pubs: List[Dict], page: int, page_size: int,
+                           card: Callable[[Dict], str]) -> str:
+    """Build one page of year-grouped cards; only entries inside the page window are rendered."""
+    window = pubs[(page - 1) * page_size: page * page_size]
+    parts, current_year = [], None
+    for p in window:
+        year = p.get("year") or "—"
+        if year != current_year:
+            parts.append(f"<div class='pub-year'><span class='pill'>{year}</span></div>")
+            current_year = year
+        parts.append(card(p))
+    return "<div class='pub-page'>" + "".join(parts) + "</div>"
+
+
+def render_publication_list(key: str, pubs: List[Dict], card: Callable[[Dict], str],
+                            page_size: int = PUBS_PAGE_SIZE, cache: bool = False) -> None:
+    """
+    Render ``pubs`` (already sorted newest first) a page at a time with a single st.markdown call.
+    With ``cache=True`` the page HTML is kept in the tenant's render cache (content-only lists).
+    """
+    pages = max(1, math.ceil(len(pubs) / page_size))
+    page = 1
+    if pages > 1:
+        page = int(st.number_input(f"Page (1–{pages})", min_value=1, max_value=pages,
+                                   value=1, step=1, key=f"{key}_page"))
+    def build() -> str:
+        return publications_page_html(pubs, page, page_size, card)
+
+    html = cached_html(f"{key}_p{page}_{page_size}", build) if cache else build()
+    st.markdown(html, unsafe_allow_html=True)
+
 
 # ---------- THEME (Blue Academic) ----------
 st.markdown("""
@@ -83,6 +262,7 @@ hr,.stDivider{opacity:.5;border-color:var(--border)}
 .stTabs [data-baseweb="tab-list"]{border-bottom:2px solid var(--border)}
 .stTabs [data-baseweb="tab"]{color:var(--muted);font-weight:500;padding:.5rem 1rem}
 .stTabs [aria-selected="true"]{color:var(--brand-dark);border-bottom:3px solid var(--brand)}
+.pub-year{margin:.9rem 0 .45rem 0}.pub-page .pub-year:first-child{margin-top:0}
 </style>
 """, unsafe_allow_html=True)
 
@@ -184,7 +364,7 @@ metrics = get_metrics()
 col_main, col_metrics = st.columns([0.7, 0.3], gap="medium")
 
 with col_main:
-    st.markdown(f"""
+    st.markdown(cached_html("hero", lambda: f"""
     <div class="card">
       <h2 style="margin:0 0 .35rem 0;">{DATA['name']}</h2>
       <p><strong>{DATA['title']}</strong></p>
@@ -192,7 +372,7 @@ with col_main:
       <p>{DATA['summary']}</p>
       {" ".join([f"<a class='btn' href='{v}' target='_blank'>{k}</a>" for k, v in DATA['links'].items()])}
     </div>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
 
 with col_metrics:
     metrics_html = f"""
@@ -218,7 +398,7 @@ with col_metrics:
 
     # Put the refresh button AFTER the metrics card (not inside an empty card)
     if st.button("🔄 Refresh Google Scholar metrics", key="refresh_metrics"):
-        get_metrics.clear()
+        tenants.SCRAPE_CACHE.pop((TENANT.slug, "metrics"))
         st.rerun()
 
 
@@ -246,34 +426,38 @@ with tabs[0]:
 # ---- Education
 with tabs[1]:
     st.markdown("### Education")
-    edu_items = []
-    for e in DATA["education"]:
-        edu_items.append(
-            f"<li><p><strong>{e['degree']}</strong>, {e['school']}<br>"
-            f"<em>{e['years']}</em><br>"
-            f"<span class='small'>{e['details']}</span></p></li>"
-        )
-    st.markdown(f"<div class='card'><ul>{''.join(edu_items)}</ul></div>", unsafe_allow_html=True)
+
+    def build_education() -> str:
+        edu_items = []
+        for e in DATA["education"]:
+            edu_items.append(
+                f"<li><p><strong>{e['degree']}</strong>, {e['school']}<br>"
+                f"<em>{e['years']}</em><br>"
+                f"<span class='small'>{e['details']}</span></p></li>"
+            )
+        return f"<div class='card'><ul>{''.join(edu_items)}</ul></div>"
+
+    st.markdown(cached_html("education", build_education), unsafe_allow_html=True)
 
 # ---- Experience
 with tabs[2]:
+    def build_experience(kind: str) -> List[str]:
+        cards = []
+        for x in DATA["experience"][kind]:
+            bullets = "".join(f"<li>{b}</li>" for b in x["bullets"])
+            cards.append(
+                f"<div class='card'><p><strong>{x['role']}</strong> — {x['org']}<br>"
+                f"<em>{x['dates']}</em></p><ul>{bullets}</ul></div>"
+            )
+        return cards
+
     st.markdown("### Teaching Experience")
-    for x in DATA["experience"]["teaching"]:
-        bullets = "".join(f"<li>{b}</li>" for b in x["bullets"])
-        st.markdown(
-            f"<div class='card'><p><strong>{x['role']}</strong> — {x['org']}<br>"
-            f"<em>{x['dates']}</em></p><ul>{bullets}</ul></div>",
-            unsafe_allow_html=True,
-        )
+    for card in cached_html("experience_teaching", lambda: build_experience("teaching")):
+        st.markdown(card, unsafe_allow_html=True)
 
     st.markdown("### Research Experience")
-    for x in DATA["experience"]["research"]:
-        bullets = "".join(f"<li>{b}</li>" for b in x["bullets"])
-        st.markdown(
-            f"<div class='card'><p><strong>{x['role']}</strong> — {x['org']}<br>"
-            f"<em>{x['dates']}</em></p><ul>{bullets}</ul></div>",
-            unsafe_allow_html=True,
-        )
+    for card in cached_html("experience_research", lambda: build_experience("research")):
+        st.markdown(card, unsafe_allow_html=True)
 
 # ---- Projects
 with tabs[3]:
@@ -292,19 +476,24 @@ with tabs[3]:
 # ---- Funding
 with tabs[4]:
     st.markdown("### Funding")
-    items = []
-    for f in DATA["funding"]:
-        items.append(
-            f"<li><p><strong>{f['project']}</strong> — {f['body']} · {f['amount']}<br>"
-            f"<span class='small'>Role: {f['role']} · Outcome: {f['outcome']}</span></p></li>"
-        )
-    st.markdown(f"<div class='card'><ul>{''.join(items)}</ul></div>", unsafe_allow_html=True)
+
+    def build_funding() -> str:
+        items = []
+        for f in DATA["funding"]:
+            items.append(
+                f"<li><p><strong>{f['project']}</strong> — {f['body']} · {f['amount']}<br>"
+                f"<span class='small'>Role: {f['role']} · Outcome: {f['outcome']}</span></p></li>"
+            )
+        return f"<div class='card'><ul>{''.join(items)}</ul></div>"
+
+    st.markdown(cached_html("funding", build_funding), unsafe_allow_html=True)
 
 # ---- Training
 with tabs[5]:
     st.markdown("### Training")
-    train_items = "".join(f"<li>{t}</li>" for t in DATA["training"])
-    st.markdown(f"<div class='card'><ul>{train_items}</ul></div>", unsafe_allow_html=True)
+    st.markdown(cached_html("training", lambda: (
+        "<div class='card'><ul>" + "".join(f"<li>{t}</li>" for t in DATA["training"]) + "</ul></div>"
+    )), unsafe_allow_html=True)
 
 # ---- Skills
 with tabs[6]:
@@ -326,36 +515,37 @@ with tabs[6]:
 # ---- Publications
 with tabs[7]:
     st.markdown("### Selected Publications")
-    for p in DATA["publications"]:
-        st.markdown(
-            f"<div class='card' style='padding:.8rem 1rem;margin-bottom:.6rem'>"
-            f"<span class='pill'>{p['year']}</span> "
-            f"<strong>{p['title']}</strong> — <em class='muted'>{p['venue']}</em>"
-            f"</div>",
-            unsafe_allow_html=True,
-        )
+    selected_pubs = cached_html("selected_pubs_sorted", lambda: sorted(
+        DATA["publications"], key=_pub_year, reverse=True
+    ))
+    render_publication_list("selected_pubs", selected_pubs, selected_pub_card, cache=True)
 
     st.markdown("### Latest Publications (auto-updated)")
     latest_pubs = get_latest_pubs(5)
     if latest_pubs:
-        for p in latest_pubs:
-            title = p.get("title", "")
-            venue = p.get("venue", "")
-            authors = p.get("authors", "")
-            year = p.get("year", "")
-            url = p.get("url", "")
-            st.markdown(
-                f"<div class='card' style='padding:.9rem 1rem;margin-bottom:.6rem'>"
-                f"<span class='pill'>{year}</span> "
-                f"<a href='{url or '#'}' target='_blank'><strong>{title}</strong></a>"
-                + (f" — <em class='muted'>{venue}</em>" if venue else "")
-                + (f"<div class='small muted' style='margin-top:.25rem'>{authors}</div>" if authors else "")
-                + f"</div>",
-                unsafe_allow_html=True,
-            )
+        pub_details = get_pub_details()
+        render_publication_list("latest_pubs", latest_pubs,
+                                lambda p: latest_pub_card(p, pub_details.get(p.get("url", ""))))
     else:
         st.info("Couldn’t fetch latest publications (Scholar may have rate-limited or blocked scraping).")
 
+    st.markdown("#### Export")
+    scraped_pubs = snapshots.cached_snapshot(
+        tenants.SCRAPE_CACHE, (TENANT.slug, "cached_pubs"),
+        lambda: scholar_scraper.load_cached_publications(TENANT.cache_namespace) or [],
+        ttl=scrape_ttl("pubs"),
+    )
+    if not scraped_pubs.data:
+        scraped_pubs = latest_pubs_snapshot(5)
+    for col, (fmt, (ext, mime)) in zip(st.columns(len(exports.FORMATS)), exports.FORMATS.items()):
+        col.download_button(
+            f"⬇️ {ext.upper() if fmt != 'bibtex' else 'BibTeX'}",
+            data=get_export(fmt, scraped_pubs),
+            file_name=f"{TENANT.slug}_publications.{ext}",
+            mime=mime,
+            key=f"export_{fmt}",
+        )
+
     st.markdown(
         f"<div class='small'>For the full publication list, visit "
         f"<a href='{DATA['links']['Google Scholar']}' target='_blank'>Google Scholar</a>.</div>",
@@ -365,17 +555,17 @@ with tabs[7]:
 # ---- Awards
 with tabs[8]:
     st.markdown("### Awards")
-    awards_list = "".join(f"<li>{a}</li>" for a in DATA["awards"])
-    st.markdown(f"<div class='card'><ul>{awards_list}</ul></div>", unsafe_allow_html=True)
+    st.markdown(cached_html("awards", lambda: (
+        "<div class='card'><ul>" + "".join(f"<li>{a}</li>" for a in DATA["awards"]) + "</ul></div>"
+    )), unsafe_allow_html=True)
 
 # ---- Contact
 with tabs[9]:
     st.markdown("### Contact")
-    st.markdown(
+    st.markdown(cached_html("contact", lambda: (
         f"<div class='card'><p><strong>Email:</strong> {DATA['email_primary']}</p>"
-        f"<p><strong>Phone:</strong> {DATA['phone']}</p></div>",
-        unsafe_allow_html=True,
-    )
+        f"<p><strong>Phone:</strong> {DATA['phone']}</p></div>"
+    )), unsafe_allow_html=True)
 
 
 
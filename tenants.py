@@ -0,0 +1,259 @@
+"""
+tenants.py
+----------
+Multi-tenant mode: serve many researcher portfolios from one Streamlit process.
+
+Tenants are listed in ``tenants.json`` next to this file (or the file named by the
+``PORTFOLIO_TENANTS`` environment variable). Paths are relative to the config file:
+
+    {
+      "habib": {
+        "data": "data.py",
+        "scholar_url": "https://scholar.google.com/citations?user=tKDhmdAAAAAJ&hl=en",
+        "bio": "static/biography.txt"
+      },
+      "jane": {"data": "tenants/jane.json", "scholar_url": "https://scholar.google.com/citations?user=..."}
+    }
+
+A tenant is picked with ``?tenant=<slug>``. Without a config file the app serves the
+single portfolio from ``data.py`` exactly as before, with the original cache files.
+
+Usage:
+    from tenants import resolve_tenant, load_content
+    tenant = resolve_tenant("jane")
+    DATA = load_content(tenant)
+"""
+from __future__ import annotations
+import os
+import re
+import json
+import time
+import threading
+import importlib.util
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Union
+
+import ttl_policy
+import snapshots
+
+APP_DIR = Path(__file__).resolve().parent
+TENANTS_PATH = Path(os.environ.get("PORTFOLIO_TENANTS", APP_DIR / "tenants.json"))
+
+DEFAULT_SLUG = "default"
+DEFAULT_SCHOLAR_URL = "https://scholar.google.com/citations?user=tKDhmdAAAAAJ&hl=en"
+
+_SLUG_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+
+class UnknownTenant(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Tenant:
+    slug: str
+    data_path: Path
+    scholar_url: str
+    bio_path: Path
+    # None keeps the original single-tenant cache file names.
+    cache_namespace: Optional[str] = None
+
+
+DEFAULT_TENANT = Tenant(
+    slug=DEFAULT_SLUG,
+    data_path=APP_DIR / "data.py",
+    scholar_url=DEFAULT_SCHOLAR_URL,
+    bio_path=APP_DIR / "static" / "biography.txt",
+)
+
+
+# ---------- MEMORY-BOUNDED LRU ----------
+def _sizeof(value: Any) -> int:
+    """Approximate the memory held by a cached value."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return snapshots.nbytes(value)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU bounded by an approximate byte budget, with optional per-entry TTL.
+    Keys are tuples whose first element is the tenant slug, so a tenant can be dropped at once.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, size, expires)
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, size, expires = entry
+            if expires is not None and time.time() >= expires:
+                self._drop(key)
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return  # never let one entry flush the whole cache
+            expires = time.time() + ttl if ttl is not None else None
+            self._entries[key] = (value, size, expires)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any],
+                   ttl: Union[float, Callable[[], float], None] = None) -> Any:
+        """``ttl`` may be a callable, evaluated after ``factory`` (for TTLs chosen by the refresh)."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.set(key, value, ttl=ttl() if callable(ttl) else ttl)
+        return value
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def clear_tenant(self, slug: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if isinstance(k, tuple) and k and k[0] == slug]:
+                self._drop(key)
+
+    def _drop(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+def _mb_from_env(name: str, default: int) -> int:
+    try:
+        return int(float(os.environ.get(name, default)) * 1024 * 1024)
+    except ValueError:
+        return default * 1024 * 1024
+
+
+CONTENT_CACHE = LRUCache(_mb_from_env("PORTFOLIO_CONTENT_CACHE_MB", 32))
+RENDER_CACHE = LRUCache(_mb_from_env("PORTFOLIO_RENDER_CACHE_MB", 64))
+SCRAPE_CACHE = LRUCache(_mb_from_env("PORTFOLIO_SCRAPE_CACHE_MB", 32))
+
+
+# ---------- REGISTRY ----------
+def _load_registry() -> Dict[str, Tenant]:
+    """Read the tenants config; re-read only when the file changes."""
+    try:
+        mtime = TENANTS_PATH.stat().st_mtime_ns
+    except OSError:
+        return {DEFAULT_SLUG: DEFAULT_TENANT}
+
+    cached = CONTENT_CACHE.get(("__registry__", mtime))
+    if cached is not None:
+        return cached
+
+    base = TENANTS_PATH.resolve().parent
+    raw = json.loads(TENANTS_PATH.read_text(encoding="utf-8"))
+    registry: Dict[str, Tenant] = {}
+    for slug, cfg in raw.items():
+        if not _SLUG_RE.match(slug):
+            raise ValueError(f"Invalid tenant slug {slug!r} in {TENANTS_PATH}")
+        namespace = cfg.get("cache_namespace", slug)
+        if not isinstance(namespace, str) or not _SLUG_RE.match(namespace):
+            raise ValueError(f"Invalid tenant cache_namespace {namespace!r} for {slug!r} in {TENANTS_PATH}")
+        registry[slug] = Tenant(
+            slug=slug,
+            data_path=(base / cfg["data"]).resolve(),
+            scholar_url=cfg["scholar_url"],
+            bio_path=(base / cfg.get("bio", f"static/{slug}/biography.txt")).resolve(),
+            cache_namespace=namespace,
+        )
+    CONTENT_CACHE.set(("__registry__", mtime), registry)
+    return registry
+
+
+def list_tenants() -> Dict[str, Tenant]:
+    return dict(_load_registry())
+
+
+def resolve_tenant(slug: Optional[str] = None) -> Tenant:
+    """Return the tenant for ``slug``; the first configured tenant when no slug is given."""
+    registry = _load_registry()
+    if not slug:
+        return registry.get(DEFAULT_SLUG) or next(iter(registry.values()))
+    slug = slug.strip().lower()
+    if slug not in registry:
+        raise UnknownTenant(f"No portfolio named {slug!r}")
+    return registry[slug]
+
+
+# ---------- CONTENT ----------
+def content_version(tenant: Tenant) -> int:
+    """Modification time of the tenant's content file; part of every render cache key."""
+    try:
+        return tenant.data_path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _read_content(path: Path) -> Dict:
+    if path.suffix == ".json":
+        return json.loads(path.read_text(encoding="utf-8"))
+    spec = importlib.util.spec_from_file_location(f"_tenant_content_{abs(hash(path))}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.DATA
+
+
+def content_snapshot(tenant: Tenant) -> snapshots.Snapshot:
+    """Immutable snapshot of the tenant's ``DATA``, shared by every session until the file changes."""
+    key = (tenant.slug, "content", content_version(tenant))
+    return snapshots.cached_snapshot(CONTENT_CACHE, key, lambda: _read_content(tenant.data_path))
+
+
+def load_content(tenant: Tenant) -> Mapping:
+    """Load the tenant's ``DATA`` (from a ``.py`` file defining DATA, or a ``.json`` file), read-only."""
+    return content_snapshot(tenant).data
+
+
+# slug -> (hash of the last bio read, adaptive TTL state)
+_bio_ttl_state: Dict[str, tuple] = {}
+
+
+def bio_ttl(tenant: Tenant) -> float:
+    """TTL the adaptive policy currently chooses for the tenant's biography."""
+    return ttl_policy.current_ttl("bio", _bio_ttl_state.get(tenant.slug, (None, None))[1])
+
+
+def load_bio(tenant: Tenant, ttl: Optional[float] = None) -> str:
+    """Read the tenant's biography; without ``ttl`` its TTL adapts to how often the file changes."""
+    def read() -> str:
+        try:
+            text = tenant.bio_path.read_text(encoding="utf-8").strip()
+        except Exception:
+            text = ""
+        digest = hash(text)
+        prev_digest, state = _bio_ttl_state.get(tenant.slug, (None, None))
+        changed = None if prev_digest is None else digest != prev_digest
+        _bio_ttl_state[tenant.slug] = (digest, ttl_policy.next_state("bio", state, changed))
+        return text
+    return CONTENT_CACHE.get_or_set((tenant.slug, "bio"), read,
+                                    ttl=ttl if ttl is not None else lambda: bio_ttl(tenant))
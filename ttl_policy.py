@@ -0,0 +1,84 @@
+"""
+ttl_policy.py
+-------------
+Adaptive cache TTLs. Each cached resource keeps a small state record; every refresh
+reports whether the value actually changed. Unchanged refreshes stretch the TTL,
+changed ones shrink it, always within the resource's configured bounds.
+
+Bounds can be overridden per resource with ``PORTFOLIO_TTL_<RESOURCE>=min:max`` (seconds),
+e.g. ``PORTFOLIO_TTL_METRICS=3600:259200``.
+
+Usage:
+    from ttl_policy import next_state, current_ttl
+    state = next_state("metrics", previous_state, changed=True)
+    ttl = current_ttl("metrics", state)
+"""
+from __future__ import annotations
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+GROWTH = 1.5   # TTL multiplier after a refresh that returned the same value
+SHRINK = 0.5   # TTL multiplier after a refresh that returned a different value
+RATE_WEIGHT = 0.3  # weight of the latest refresh in the exponentially weighted change rate
+
+
+@dataclass(frozen=True)
+class TTLBounds:
+    initial: float
+    minimum: float
+    maximum: float
+
+
+# Citations move daily, the publication list every few weeks, the photo almost never.
+DEFAULT_BOUNDS: Dict[str, TTLBounds] = {
+    "metrics": TTLBounds(initial=12 * HOUR, minimum=2 * HOUR, maximum=3 * DAY),
+    "pubs": TTLBounds(initial=12 * HOUR, minimum=6 * HOUR, maximum=14 * DAY),
+    "photo": TTLBounds(initial=7 * DAY, minimum=1 * DAY, maximum=60 * DAY),
+    "bio": TTLBounds(initial=1 * HOUR, minimum=5 * 60, maximum=1 * DAY),
+}
+
+
+def bounds(resource: str) -> TTLBounds:
+    """Configured bounds for ``resource``, with the environment override applied."""
+    b = DEFAULT_BOUNDS.get(resource, DEFAULT_BOUNDS["metrics"])
+    raw = os.environ.get(f"PORTFOLIO_TTL_{resource.upper()}")
+    if raw:
+        try:
+            lo, hi = (float(x) for x in raw.split(":"))
+            if 0 < lo <= hi:
+                b = TTLBounds(initial=min(max(b.initial, lo), hi), minimum=lo, maximum=hi)
+        except ValueError:
+            pass
+    return b
+
+
+def current_ttl(resource: str, state: Optional[Dict] = None) -> float:
+    """TTL chosen for ``resource`` given its stored state (initial TTL when there is none)."""
+    b = bounds(resource)
+    ttl = (state or {}).get("ttl", b.initial)
+    return min(max(float(ttl), b.minimum), b.maximum)
+
+
+def next_state(resource: str, state: Optional[Dict], changed: Optional[bool]) -> Dict:
+    """
+    Advance the TTL state after a refresh. ``changed`` is None for the first value ever
+    stored (nothing to compare with), which keeps the current TTL.
+    """
+    state = dict(state or {})
+    b = bounds(resource)
+    ttl = current_ttl(resource, state)
+    if changed is not None:
+        ttl = ttl * (SHRINK if changed else GROWTH)
+        state["refreshes"] = state.get("refreshes", 0) + 1
+        state["changes"] = state.get("changes", 0) + int(changed)
+        rate = state.get("change_rate", 0.5)
+        state["change_rate"] = round((1 - RATE_WEIGHT) * rate + RATE_WEIGHT * float(changed), 4)
+        if changed:
+            state["last_change"] = time.time()
+    state["ttl"] = round(min(max(ttl, b.minimum), b.maximum), 1)
+    return state